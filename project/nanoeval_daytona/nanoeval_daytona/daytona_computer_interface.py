@@ -1,10 +1,33 @@
 """Daytona sandbox integration for nanoeval."""
 
+import ast
+import asyncio
+import atexit
+import functools
+import io
+import json
+import logging
 import os
+import shlex
+import tarfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Dict, Optional, cast
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Optional,
+    Union,
+    cast,
+)
 
-import async_lru
+import httpx
 import structlog
 from daytona_sdk import Daytona, DaytonaConfig, LspLanguageId, SandboxResources
 from pydantic import BaseModel
@@ -21,6 +44,23 @@ from nanoeval.solvers.computer_tasks.code_execution_interface import (
 
 logger = structlog.get_logger(component=__name__)
 
+# Hot paths (one call per model tool-call) guard their debug logs on the
+# stdlib level so dropped events don't still pay kwarg serialization.
+_stdlib_logger = logging.getLogger(__name__)
+
+
+def _debug_enabled() -> bool:
+    return _stdlib_logger.isEnabledFor(logging.DEBUG)
+
+# orjson parses multi-MB result payloads several times faster than the stdlib
+# json module; fall back silently when it isn't installed (perf extra).
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Default timeout for code execution
 DAYTONA_TIMEOUT = int(os.getenv("DAYTONA_TIMEOUT", "180"))
 
@@ -35,6 +75,47 @@ DAYTONA_SANDBOX_MEMORY = int(os.getenv("DAYTONA_SANDBOX_MEMORY", "4"))
 DAYTONA_SANDBOX_DISK = int(os.getenv("DAYTONA_SANDBOX_DISK", "10"))
 DAYTONA_AUTO_STOP_INTERVAL = int(os.getenv("DAYTONA_AUTO_STOP_INTERVAL", "30"))
 
+# Number of sandboxes to keep pre-warmed; 0 disables the pool
+DAYTONA_POOL_SIZE = int(os.getenv("DAYTONA_POOL_SIZE", "0"))
+
+# Set to 0 for deployments whose shell API needs one command per call; setup
+# commands are then issued concurrently instead of as a single '&&' chain.
+DAYTONA_BATCH_SETUP = os.getenv("DAYTONA_BATCH_SETUP", "1") != "0"
+
+# Chunk size for streamed file uploads
+DAYTONA_UPLOAD_CHUNK_SIZE = int(os.getenv("DAYTONA_UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))
+
+# Part size and in-flight cap for multipart parallel transfers
+DAYTONA_UPLOAD_PART_SIZE = int(os.getenv("DAYTONA_UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+DAYTONA_UPLOAD_CONCURRENCY = int(os.getenv("DAYTONA_UPLOAD_CONCURRENCY", "8"))
+
+# Concurrency ceilings for the SDK's HTTP client and the event loop's default
+# executor; the SDK defaults bottleneck highly concurrent eval runs.
+DAYTONA_MAX_CONNECTIONS = int(os.getenv("DAYTONA_MAX_CONNECTIONS", "100"))
+DAYTONA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("DAYTONA_MAX_KEEPALIVE_CONNECTIONS", "50"))
+# 0 leaves the interpreter's default executor sizing untouched
+DAYTONA_MAX_WORKERS = int(os.getenv("DAYTONA_MAX_WORKERS", "0"))
+
+# Only snapshot a configured sandbox when its setup took at least this long;
+# below that, forking saves less than the snapshot costs.
+DAYTONA_SNAPSHOT_MIN_SETUP_SECONDS = float(os.getenv("DAYTONA_SNAPSHOT_MIN_SETUP_SECONDS", "5"))
+
+# Cap on concurrent create/remove calls so request bursts don't trip the
+# Daytona API's rate limits into retry/backoff storms
+DAYTONA_MAX_INFLIGHT = int(os.getenv("DAYTONA_MAX_INFLIGHT", "32"))
+
+# Readiness webhook: when a base URL is configured, sandboxes POST to it once
+# their Python kernel imports, instead of us probing with a shell round-trip.
+DAYTONA_READY_WEBHOOK_URL = os.getenv("DAYTONA_READY_WEBHOOK_URL")
+DAYTONA_READY_WEBHOOK_PORT = int(os.getenv("DAYTONA_READY_WEBHOOK_PORT", "8799"))
+
+# Init command injected at sandbox create time to push the readiness signal.
+# The URL carries a token we generated before create, since the sandbox id
+# isn't known (and no documented env var exposes it) inside the sandbox.
+_READY_INIT_COMMAND = (
+    'python -c "import sys" && curl -fsS -X POST "{url}" || true'
+)
+
 
 class Python3ExceptionDict(BaseModel):
     """A pydantic model for serializing a Python 3.x exception.
@@ -52,21 +133,122 @@ class Python3ExceptionDict(BaseModel):
     notes: list[str]
 
 
+@functools.lru_cache(maxsize=256)
+def _daytona_params(cpu: int, memory_gb: int, disk_gb: int, auto_stop_interval: int) -> Dict[str, Any]:
+    """Build sandbox params for a resource fingerprint, memoized.
+
+    Eval suites submit thousands of tasks sharing a handful of resource
+    shapes; rebuilding the dict and SandboxResources per run() is avoidable
+    allocation churn.
+    """
+    return {
+        "language": LspLanguageId.PYTHON,
+        "resources": SandboxResources(cpu=cpu, memory=memory_gb, disk=disk_gb),
+        "autoStopInterval": auto_stop_interval,
+    }
+
+
+def _close_http_client(client: httpx.AsyncClient) -> None:
+    try:
+        asyncio.run(client.aclose())
+    except Exception:
+        # Interpreter shutdown; the OS reclaims the sockets anyway.
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_http_client() -> httpx.AsyncClient:
+    """One HTTP client - connection pool, keepalive and TLS state - shared by
+    every SDK instance, so TCP/TLS handshakes amortize across eval workers."""
+    limits = httpx.Limits(
+        max_connections=DAYTONA_MAX_CONNECTIONS,
+        max_keepalive_connections=DAYTONA_MAX_KEEPALIVE_CONNECTIONS,
+    )
+    timeout = httpx.Timeout(60.0)
+    try:
+        client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+    except ImportError:
+        # HTTP/2 needs the optional h2 package; plain HTTP/1.1 still pools.
+        client = httpx.AsyncClient(limits=limits, timeout=timeout)
+    atexit.register(_close_http_client, client)
+    return client
+
+
+def _tune_http_client(daytona: Daytona) -> None:
+    """Point the SDK client at the shared HTTP client for concurrent evals.
+
+    The SDK's internals aren't a stable API, so failures here degrade to the
+    SDK's own per-instance client rather than erroring.
+    """
+    if getattr(daytona, "_nanoeval_http_tuned", False):
+        return
+    try:
+        client = getattr(daytona, "_client", None)
+        if client is not None and hasattr(client, "_client"):
+            client._client = _shared_http_client()
+        daytona._nanoeval_http_tuned = True
+    except Exception as e:
+        logger.debug("Could not tune SDK HTTP client", error=str(e))
+
+
+def _tune_default_executor() -> None:
+    """Size the event loop's default executor for many blocking SDK calls."""
+    if DAYTONA_MAX_WORKERS <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    if not getattr(loop, "_nanoeval_executor_tuned", False):
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=DAYTONA_MAX_WORKERS))
+        loop._nanoeval_executor_tuned = True  # type: ignore[attr-defined]
+
+
+@functools.lru_cache(maxsize=16)
+def _get_daytona_client(
+    api_key: Optional[str], server_url: Optional[str], target: Optional[str]
+) -> Daytona:
+    """Share Daytona SDK clients (and their connection state) across managers.
+
+    Constructing a fresh client per manager repeats HTTP handshake/pool setup;
+    the LRU bound keeps rarely-used credential combinations from accumulating.
+    """
+    return Daytona(DaytonaConfig(api_key=api_key, server_url=server_url, target=target))
+
+
 class DaytonaSandboxManager:
     """Manages Daytona sandbox operations."""
 
-    def __init__(self, config: Optional[DaytonaConfig] = None):
-        """Initialize the Daytona sandbox manager with optional config override."""
+    def __init__(self, config: Optional[DaytonaConfig] = None, pool_size: int = DAYTONA_POOL_SIZE):
+        """Initialize the Daytona sandbox manager with optional config override.
+
+        If pool_size > 0, the manager keeps that many default-parameter sandboxes
+        pre-created in the background so acquire_sandbox can hand one out without
+        paying cold-start latency. Whoever enables a pool owns its teardown and
+        must call close() when done, or the pooled sandboxes outlive the run.
+        """
         self.config = config or DaytonaConfig(
             api_key=DAYTONA_API_KEY,
             server_url=DAYTONA_SERVER_URL,
             target=DAYTONA_TARGET,
         )
-        self.daytona = Daytona(self.config)
-
-    async def create_sandbox(self, params: Optional[Dict[str, Any]] = None) -> Any:
-        """Create a new sandbox with specified parameters."""
-        default_params = {
+        self.daytona = _get_daytona_client(
+            self.config.api_key, self.config.server_url, self.config.target
+        )
+        _tune_http_client(self.daytona)
+        self.pool_size = pool_size
+        self._pool: asyncio.Queue[Any] = asyncio.Queue()
+        self._pool_filler: Optional[asyncio.Task[None]] = None
+        self._closed = False
+        self._ready_events: Dict[str, asyncio.Event] = {}
+        self._ready_tokens: Dict[str, str] = {}
+        self._webhook_runner: Optional[Any] = None
+        self._webhook_failed = False
+        self._snapshots: Dict[Any, Any] = {}
+        # Instance-level (not class-level) so the semaphore binds to the event
+        # loop its manager runs on.
+        self._lifecycle_sem = asyncio.Semaphore(DAYTONA_MAX_INFLIGHT)
+
+    @staticmethod
+    def _default_params() -> Dict[str, Any]:
+        return {
             "language": LspLanguageId.PYTHON,
             "resources": SandboxResources(
                 cpu=DAYTONA_SANDBOX_CPU,
@@ -75,43 +257,374 @@ class DaytonaSandboxManager:
             ),
             "autoStopInterval": DAYTONA_AUTO_STOP_INTERVAL,
         }
-        effective_params = {**default_params, **(params or {})}
-        logger.info("Creating Daytona sandbox", params=effective_params)
-        return await self.daytona.create(effective_params)
+
+    async def create_sandbox(self, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Create a new sandbox with specified parameters."""
+        _tune_default_executor()
+        effective_params = {**self._default_params(), **(params or {})}
+        ready_token: Optional[str] = None
+        if DAYTONA_READY_WEBHOOK_URL:
+            await self._start_readiness_server()
+            if self._webhook_runner is not None:
+                # The sandbox id doesn't exist yet, so readiness is keyed by a
+                # token we generate here and bake into the init command's URL.
+                ready_token = uuid.uuid4().hex
+                self._sandbox_ready_event(ready_token)
+                init_commands = list(effective_params.get("initCommands", []))
+                init_commands.append(
+                    _READY_INIT_COMMAND.format(
+                        url=f"{DAYTONA_READY_WEBHOOK_URL.rstrip('/')}/ready/{ready_token}"
+                    )
+                )
+                effective_params["initCommands"] = init_commands
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            logger.info("Creating Daytona sandbox", params=effective_params)
+        async with self._lifecycle_sem:
+            sandbox = await self.daytona.create(effective_params)
+        if ready_token is not None:
+            self._ready_tokens[str(sandbox.id)] = ready_token
+        return sandbox
+
+    def _sandbox_ready_event(self, key: Any) -> asyncio.Event:
+        return self._ready_events.setdefault(str(key), asyncio.Event())
+
+    def notify_sandbox_ready(self, key: Any) -> None:
+        """Mark a sandbox as ready, keyed by readiness token or sandbox id."""
+        self._sandbox_ready_event(key).set()
+
+    async def wait_sandbox_ready(self, sandbox_id: Any, timeout: int = DAYTONA_TIMEOUT) -> None:
+        """Wait for a sandbox to push its readiness signal.
+
+        Only sandboxes we registered a readiness token for have a push channel
+        to wait on. For everything else - webhook disabled or failed to bind,
+        forked sandboxes (initCommands don't run on fork), or sandboxes this
+        manager didn't create - a running sandbox is as ready as it gets, so
+        the event is set eagerly rather than stalling until the timeout.
+        """
+        token = self._ready_tokens.get(str(sandbox_id))
+        if self._webhook_runner is None or token is None:
+            event = self._sandbox_ready_event(sandbox_id)
+            event.set()
+        else:
+            event = self._sandbox_ready_event(token)
+        await asyncio.wait_for(event.wait(), timeout)
+
+    async def _start_readiness_server(self) -> None:
+        """Host the aiohttp endpoint that sandboxes POST to once booted.
+
+        A failed bind (e.g. another manager already owns the port) disables
+        the webhook for this manager; readiness then degrades to the eager
+        create()-implies-ready behavior instead of erroring every create.
+        """
+        if self._webhook_runner is not None or self._webhook_failed:
+            return
+        from aiohttp import web
+
+        async def _handle_ready(request: Any) -> Any:
+            self.notify_sandbox_ready(request.match_info["token"])
+            return web.Response()
+
+        app = web.Application()
+        app.add_routes([web.post("/ready/{token}", _handle_ready)])
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            site = web.TCPSite(runner, port=DAYTONA_READY_WEBHOOK_PORT)
+            await site.start()
+        except OSError as e:
+            logger.warning(
+                "Could not bind readiness webhook, falling back to eager readiness",
+                port=DAYTONA_READY_WEBHOOK_PORT,
+                error=str(e),
+            )
+            await runner.cleanup()
+            self._webhook_failed = True
+            return
+        self._webhook_runner = runner
+        logger.info("Started sandbox readiness webhook", port=DAYTONA_READY_WEBHOOK_PORT)
+
+    async def acquire_sandbox(self, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Return a ready sandbox, preferring the warm pool over a cold create.
+
+        Pooled sandboxes are created with default parameters, so the pool is
+        only consulted when the requested params are the defaults (or omitted).
+        """
+        self._ensure_pool_filler()
+        if self.pool_size > 0 and (not params or {**self._default_params(), **params} == self._default_params()):
+            try:
+                sandbox = self._pool.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            else:
+                logger.debug("Handing out pre-warmed sandbox")
+                self._ensure_pool_filler()
+                return sandbox
+        return await self.create_sandbox(params)
+
+    def _ensure_pool_filler(self) -> None:
+        """(Re)start the background task that tops up the warm pool."""
+        if self.pool_size <= 0 or self._closed:
+            return
+        if self._pool_filler is None or self._pool_filler.done():
+            self._pool_filler = asyncio.create_task(self._fill_pool())
+
+    async def _fill_pool(self) -> None:
+        while self._pool.qsize() < self.pool_size:
+            try:
+                sandbox = await self.create_sandbox()
+            except Exception as e:
+                # Don't crash the filler; the next acquire/remove restarts it.
+                logger.warning("Failed to pre-warm sandbox", error=str(e))
+                return
+            self._pool.put_nowait(sandbox)
+
+    async def close(self) -> None:
+        """Tear down the warm pool and any sandboxes still parked in it.
+
+        Callers that enable a pool (or the readiness webhook) are responsible
+        for invoking this once they're done with the manager; the runtime
+        never does it for them. close() is idempotent and stops the filler
+        from restarting on subsequent remove_sandbox calls.
+        """
+        self._closed = True
+        if self._webhook_runner is not None:
+            await self._webhook_runner.cleanup()
+            self._webhook_runner = None
+        if self._pool_filler is not None:
+            self._pool_filler.cancel()
+            self._pool_filler = None
+        while not self._pool.empty():
+            sandbox = self._pool.get_nowait()
+            try:
+                await self.remove_sandbox(sandbox)
+            except Exception as e:
+                logger.error("Failed to remove pooled sandbox", error=str(e))
 
     async def execute_code(self, sandbox: Any, code: str, timeout: int = DAYTONA_TIMEOUT) -> Dict[str, Any]:
         """Execute code in a sandbox with timeout."""
-        logger.debug("Executing code in sandbox", timeout=timeout)
-        return await sandbox.process.code_run(code, {"timeout": timeout * 1000})
+        if _debug_enabled():
+            logger.debug("Executing code in sandbox", timeout=timeout)
+        # Yield once so other sandboxes' pending work gets serviced before a
+        # potentially long RPC.
+        await asyncio.sleep(0)
+        code_run = sandbox.process.code_run
+        if asyncio.iscoroutinefunction(code_run):
+            result = await code_run(code, {"timeout": timeout * 1000})
+        else:
+            # Sync-under-the-hood SDK wrappers would otherwise block the event
+            # loop for the whole call and serialize all sandboxes.
+            result = await asyncio.to_thread(code_run, code, {"timeout": timeout * 1000})
+        # Some transports hand back the raw JSON payload; decode it ourselves
+        # with orjson when available rather than the stdlib parser.
+        if isinstance(result, (bytes, bytearray, str)):
+            result = _json_loads(result)
+        return result
 
     async def execute_shell(self, sandbox: Any, command: str, timeout: int = DAYTONA_TIMEOUT) -> Dict[str, Any]:
-        """Execute shell command in a sandbox with timeout."""
-        logger.debug("Executing shell command in sandbox", command=command, timeout=timeout)
-        return await sandbox.shell.exec(command, {"timeout": timeout * 1000})
-
-    async def upload_file(self, sandbox: Any, content: bytes, path: str) -> None:
-        """Upload a file to the sandbox."""
-        logger.debug("Uploading file to sandbox", path=path)
-        await sandbox.fs.write_file(path, content)
-
-    async def download_file(self, sandbox: Any, path: str) -> bytes:
-        """Download a file from the sandbox."""
-        logger.debug("Downloading file from sandbox", path=path)
-        return await sandbox.fs.read_file(path)
+        """Execute shell command in a sandbox with timeout.
+
+        The returned dict's "output" field is normalized to bytes at this SDK
+        boundary: surrogateescape keeps non-UTF8 process output round-trippable
+        instead of raising, and downstream code avoids a second full-buffer
+        encode.
+        """
+        if _debug_enabled():
+            logger.debug("Executing shell command in sandbox", command=command, timeout=timeout)
+        await asyncio.sleep(0)
+        shell_exec = sandbox.shell.exec
+        if asyncio.iscoroutinefunction(shell_exec):
+            result = await shell_exec(command, {"timeout": timeout * 1000})
+        else:
+            result = await asyncio.to_thread(shell_exec, command, {"timeout": timeout * 1000})
+        if isinstance(result, dict) and isinstance(result.get("output"), str):
+            result = {**result, "output": result["output"].encode("utf-8", "surrogateescape")}
+        return result
+
+    async def upload_file(
+        self,
+        sandbox: Any,
+        content: Union[bytes, BinaryIO, AsyncIterator[bytes]],
+        path: str,
+    ) -> None:
+        """Upload a file to the sandbox.
+
+        Small bytes payloads go up in one write. Larger payloads, file-like
+        objects and async byte iterators are streamed in fixed-size chunks so
+        peak memory stays bounded instead of holding the whole blob twice.
+        """
+        if _debug_enabled():
+            logger.debug("Uploading file to sandbox", path=path)
+        if isinstance(content, bytes) and len(content) <= DAYTONA_UPLOAD_CHUNK_SIZE:
+            await sandbox.fs.write_file(path, content)
+            return
+
+        append_file = getattr(sandbox.fs, "append_file", None)
+        if append_file is None:
+            # No append API on this SDK: buffer the payload and do the single
+            # whole-buffer write that always worked, rather than failing.
+            buffer = bytearray()
+            async for chunk in self._iter_upload_chunks(content):
+                buffer += chunk
+            await sandbox.fs.write_file(path, bytes(buffer))
+            return
+
+        wrote_first = False
+        async for chunk in self._iter_upload_chunks(content):
+            if not wrote_first:
+                await sandbox.fs.write_file(path, chunk)
+                wrote_first = True
+            else:
+                await append_file(path, chunk)
+        if not wrote_first:
+            await sandbox.fs.write_file(path, b"")
+
+    async def upload_file_parallel(
+        self,
+        sandbox: Any,
+        content: bytes,
+        path: str,
+        part_size: int = DAYTONA_UPLOAD_PART_SIZE,
+        concurrency: int = DAYTONA_UPLOAD_CONCURRENCY,
+    ) -> None:
+        """Upload a large file by transferring ranged parts concurrently.
+
+        Parts are zero-copy memoryview slices sent via the filesystem's ranged
+        write API, with a semaphore capping in-flight requests. Falls back to
+        the streaming upload when the API is unavailable or the payload fits
+        in a single part.
+        """
+        write_part = getattr(sandbox.fs, "write_file_part", None)
+        if write_part is None or len(content) <= part_size:
+            await self.upload_file(sandbox, content, path)
+            return
+
+        logger.debug("Uploading file in parallel parts", path=path, parts=-(-len(content) // part_size))
+        view = memoryview(content)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _put_part(offset: int) -> None:
+            async with semaphore:
+                await write_part(path, offset, view[offset : offset + part_size])
+
+        await asyncio.gather(*(_put_part(offset) for offset in range(0, len(view), part_size)))
+
+    @staticmethod
+    async def _iter_upload_chunks(
+        content: Union[bytes, BinaryIO, AsyncIterator[bytes]],
+    ) -> AsyncIterator[bytes]:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            view = memoryview(content)
+            for offset in range(0, len(view), DAYTONA_UPLOAD_CHUNK_SIZE):
+                yield bytes(view[offset : offset + DAYTONA_UPLOAD_CHUNK_SIZE])
+        elif hasattr(content, "read"):
+            loop = asyncio.get_running_loop()
+            # File reads are blocking; keep them off the event loop.
+            while chunk := await loop.run_in_executor(
+                None, content.read, DAYTONA_UPLOAD_CHUNK_SIZE
+            ):
+                yield chunk
+        else:
+            async for chunk in content:
+                yield chunk
+
+    async def download_file(self, sandbox: Any, path: str) -> Union[bytes, memoryview]:
+        """Download a file from the sandbox.
+
+        Returns a readonly memoryview over the SDK's buffer where possible, so
+        callers can slice, hash, or write it to disk without another copy.
+        """
+        if _debug_enabled():
+            logger.debug("Downloading file from sandbox", path=path)
+        raw = await sandbox.fs.read_file(path)
+        if isinstance(raw, (bytes, bytearray)):
+            return memoryview(raw).toreadonly()
+        return raw
+
+    async def snapshot(self, sandbox: Any) -> Optional[Any]:
+        """Snapshot a sandbox, returning a snapshot id (None if unsupported)."""
+        snapshot_fn = getattr(self.daytona, "snapshot", None)
+        if snapshot_fn is None:
+            return None
+        logger.info("Snapshotting sandbox")
+        return await snapshot_fn(sandbox)
+
+    async def fork(self, snapshot_id: Any) -> Any:
+        """Create a new sandbox from a snapshot."""
+        fork_fn = getattr(self.daytona, "fork", None)
+        if fork_fn is None:
+            raise RuntimeError("This Daytona deployment does not support forking from snapshots")
+        logger.info("Forking sandbox from snapshot", snapshot_id=snapshot_id)
+        sandbox = await fork_fn(snapshot_id)
+        # Forked sandboxes never run initCommands, so no push signal is
+        # coming; mark them ready immediately.
+        self.notify_sandbox_ready(sandbox.id)
+        return sandbox
+
+    def snapshot_for(self, key: Any) -> Optional[Any]:
+        """Look up a previously recorded snapshot for a setup fingerprint."""
+        return self._snapshots.get(key)
+
+    async def try_snapshot(self, key: Any, sandbox: Any) -> None:
+        """Record a snapshot for a setup fingerprint, best effort."""
+        if key in self._snapshots:
+            return
+        try:
+            snapshot_id = await self.snapshot(sandbox)
+        except Exception as e:
+            logger.debug("Snapshotting sandbox failed", error=str(e))
+            return
+        if snapshot_id is not None:
+            self._snapshots[key] = snapshot_id
 
     async def remove_sandbox(self, sandbox: Any) -> None:
         """Remove a sandbox."""
         logger.info("Removing sandbox")
-        await self.daytona.remove(sandbox)
+        async with self._lifecycle_sem:
+            await self.daytona.remove(sandbox)
+        # Replace the capacity we just gave up so the pool stays warm.
+        self._ensure_pool_filler()
 
 
 class DaytonaComputerInterface(JupyterComputerInterface):
-    """Implements the ComputerInterface using Daytona sandboxes."""
+    """Implements the ComputerInterface using Daytona sandboxes.
 
-    def __init__(self, sandbox_manager: DaytonaSandboxManager, sandbox: Any):
+    The sandbox can be provided up front or created lazily from
+    sandbox_factory on first use, so tasks that never touch the computer
+    don't pay for a sandbox at all.
+    """
+
+    def __init__(
+        self,
+        sandbox_manager: DaytonaSandboxManager,
+        sandbox: Any = None,
+        *,
+        sandbox_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        assert sandbox is not None or sandbox_factory is not None, (
+            "Either a sandbox or a sandbox_factory is required"
+        )
         self.sandbox_manager = sandbox_manager
-        self.sandbox = sandbox
+        self._sandbox = sandbox
+        self._sandbox_factory = sandbox_factory
+        self._sandbox_lock = asyncio.Lock()
         self._internet_disabled = False
+        self._kernel_ready = asyncio.Event()
+        self._kernel_init_lock = asyncio.Lock()
+
+    @property
+    def sandbox(self) -> Any:
+        """The underlying sandbox, or None if it hasn't been created yet."""
+        return self._sandbox
+
+    async def _ensure_sandbox(self) -> Any:
+        """Create the sandbox on first use; all public methods go through this."""
+        if self._sandbox is not None:
+            return self._sandbox
+        async with self._sandbox_lock:
+            if self._sandbox is None:
+                assert self._sandbox_factory is not None
+                self._sandbox = await self._sandbox_factory()
+        return self._sandbox
 
     async def disable_internet(self) -> None:
         """Disable internet access for the sandbox."""
@@ -123,35 +636,83 @@ class DaytonaComputerInterface(JupyterComputerInterface):
 
     async def upload(self, file: bytes, destination: str) -> None:
         """Upload a file to the sandbox."""
-        await self.sandbox_manager.upload_file(self.sandbox, file, destination)
+        sandbox = await self._ensure_sandbox()
+        await self.sandbox_manager.upload_file(sandbox, file, destination)
+
+    async def upload_many(self, files: Dict[str, bytes]) -> None:
+        """Upload many files as a single tar archive.
+
+        Bundling converts one round-trip per file into a single upload plus a
+        remote untar, which dominates when shipping many small files.
+        """
+        if not files:
+            return
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            for destination, data in files.items():
+                info = tarfile.TarInfo(name=destination.lstrip("/"))
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        archive_path = f"/tmp/upload-{uuid.uuid4().hex}.tar"
+        sandbox = await self._ensure_sandbox()
+        await self.sandbox_manager.upload_file(sandbox, buf.getvalue(), archive_path)
+        quoted = shlex.quote(archive_path)
+        result = await self.send_shell_command(f"tar -xf {quoted} -C / && rm -f {quoted}")
+        if result.exit_code != 0:
+            raise RuntimeError(
+                f"Failed to extract uploaded archive {archive_path} "
+                f"(exit code {result.exit_code}): {result.output.decode('utf-8', 'replace')}"
+            )
 
     async def download(self, file: str) -> bytes:
-        """Download a file from the sandbox."""
-        return await self.sandbox_manager.download_file(self.sandbox, file)
+        """Download a file from the sandbox.
+
+        The ComputerInterface contract promises bytes, and cross-backend
+        callers rely on that (e.g. .decode()); only the manager-level
+        download_file exposes the zero-copy memoryview.
+        """
+        sandbox = await self._ensure_sandbox()
+        content = await self.sandbox_manager.download_file(sandbox, file)
+        return content if isinstance(content, bytes) else bytes(content)
 
     async def send_shell_command(self, cmd: str) -> ExecutionResult:
         """Execute a shell command in the sandbox."""
-        result = await self.sandbox_manager.execute_shell(self.sandbox, cmd)
+        sandbox = await self._ensure_sandbox()
+        result = await self.sandbox_manager.execute_shell(sandbox, cmd)
+        # Keep outputs that already arrive as bytes as-is; only str round-trips
+        # through an encode, so large captures aren't copied twice.
+        output = result.get("output", b"")
         return ExecutionResult(
-            output=result.get("output", "").encode("utf-8"),
+            output=output if isinstance(output, bytes) else output.encode("utf-8"),
             exit_code=result.get("exitCode", 1),
         )
 
     async def fetch_container_names(self) -> list[str]:
         """Return the sandbox ID as a container name for compatibility."""
-        return [str(self.sandbox.id)]
+        sandbox = await self._ensure_sandbox()
+        return [str(sandbox.id)]
 
     async def stop(self) -> None:
-        """Stop the sandbox."""
-        await self.sandbox_manager.remove_sandbox(self.sandbox)
+        """Stop the sandbox, if one was ever created."""
+        if self._sandbox is None:
+            return
+        sandbox, self._sandbox = self._sandbox, None
+        await self.sandbox_manager.remove_sandbox(sandbox)
 
     @override
     async def execute(self, code: str, timeout: int = DAYTONA_TIMEOUT) -> JupyterExecutionResult:
         """Execute Python code in the sandbox."""
+        # Agent loops often probe with empty or constant snippets; answer those
+        # locally instead of paying a sandbox round-trip.
+        fast_result = self._try_execute_locally(code)
+        if fast_result is not None:
+            return fast_result
+
+        sandbox = await self._ensure_sandbox()
         await self._initialize_kernel_once()
 
         try:
-            result = await self.sandbox_manager.execute_code(self.sandbox, code, timeout)
+            result = await self.sandbox_manager.execute_code(sandbox, code, timeout)
 
             # Parse result
             output = result.get("output", "")
@@ -187,18 +748,56 @@ class DaytonaComputerInterface(JupyterComputerInterface):
                 system_exception=str(e),
             )
 
-    @async_lru.alru_cache(maxsize=1)
-    async def _initialize_kernel_once(self) -> None:
-        """Initialize the Python kernel if needed."""
-        # Check if kernel is already running or initialize it
+    @staticmethod
+    def _try_execute_locally(code: str) -> Optional[JupyterExecutionResult]:
+        """Evaluate trivial code without the sandbox, or None if it needs one.
+
+        Handles the empty/no-op case and single constant expressions, which a
+        kernel would simply echo back.
+        """
+        code_stripped = code.strip()
+        if not code_stripped or code_stripped == "pass":
+            return JupyterExecutionResult(
+                status="success",
+                output="",
+                final_expression_output=None,
+                in_kernel_exception=None,
+                system_exception=None,
+            )
         try:
-            # This is a placeholder - Daytona might handle this differently
-            await self.send_shell_command("python -c 'print(\"Kernel check\")'")
-            logger.debug("Kernel is already running")
-        except Exception:
-            logger.info("Initializing Python kernel")
-            # Setup Python environment
-            await self.send_shell_command("python -m pip install ipykernel")
+            tree = ast.parse(code_stripped, mode="eval")
+        except SyntaxError:
+            return None
+        if not isinstance(tree.body, ast.Constant):
+            return None
+        return JupyterExecutionResult(
+            status="success",
+            output="",
+            final_expression_output=repr(tree.body.value),
+            in_kernel_exception=None,
+            system_exception=None,
+        )
+
+    async def _initialize_kernel_once(self) -> None:
+        """Wait for the sandbox's kernel readiness signal (at most once).
+
+        A plain Event check is much cheaper than an async cache lookup on this
+        per-execute hot path; the lock only matters for concurrent first calls.
+        """
+        if self._kernel_ready.is_set():
+            return
+        async with self._kernel_init_lock:
+            if self._kernel_ready.is_set():
+                return
+            sandbox = await self._ensure_sandbox()
+            try:
+                await self.sandbox_manager.wait_sandbox_ready(sandbox.id)
+            except asyncio.TimeoutError:
+                # The push signal never arrived; fall back to setting up the
+                # kernel environment ourselves.
+                logger.info("Readiness signal timed out, initializing Python kernel")
+                await self.send_shell_command("python -m pip install ipykernel")
+            self._kernel_ready.set()
 
 
 @chz.chz
@@ -213,53 +812,101 @@ class DaytonaComputerRuntime(ComputerRuntime):
         # Convert computer configuration to Daytona sandbox parameters
         params = self._config_to_daytona_params(config)
 
-        # Create the sandbox
-        sandbox = await self.sandbox_manager.create_sandbox(params)
-
-        try:
-            # Set up working directory if specified
-            if config.cwd and config.cwd != "/":
-                await self.sandbox_manager.execute_shell(
-                    sandbox, f"mkdir -p {config.cwd} && cd {config.cwd}"
-                )
-
-            # Set up environment variables
-            for key, value in config.environment.items():
-                await self.sandbox_manager.execute_shell(
-                    sandbox, f"export {key}=\"{value}\""
+        snapshot_key = self._snapshot_key(config)
+
+        async def _create_and_setup() -> Any:
+            # Fork from a snapshot when this exact setup has run before;
+            # otherwise acquire a sandbox (pre-warmed if the manager keeps a
+            # pool) and configure it.
+            sandbox = None
+            snapshot_id = self.sandbox_manager.snapshot_for(snapshot_key)
+            if snapshot_id is not None:
+                try:
+                    sandbox = await self.sandbox_manager.fork(snapshot_id)
+                except Exception as e:
+                    logger.warning(
+                        "Forking from snapshot failed, creating fresh sandbox", error=str(e)
+                    )
+            needs_setup = sandbox is None
+            if sandbox is None:
+                sandbox = await self.sandbox_manager.acquire_sandbox(params)
+
+            # A setup failure here happens before the interface ever sees the
+            # sandbox, so the context manager can't clean it up - remove it
+            # ourselves before propagating.
+            try:
+                # Set up working directory and environment variables in a
+                # single shell exec rather than one round-trip per command.
+                setup_commands = []
+                if config.cwd and config.cwd != "/":
+                    quoted_cwd = shlex.quote(config.cwd)
+                    setup_commands.append(f"mkdir -p {quoted_cwd} && cd {quoted_cwd}")
+                setup_commands.extend(
+                    f"export {key}={shlex.quote(str(value))}"
+                    for key, value in config.environment.items()
                 )
+                if needs_setup and setup_commands:
+                    setup_start = time.monotonic()
+                    if DAYTONA_BATCH_SETUP:
+                        await self.sandbox_manager.execute_shell(
+                            sandbox, " && ".join(setup_commands)
+                        )
+                    else:
+                        # The commands are independent, so at least overlap
+                        # their round-trips: total latency is the max, not the
+                        # sum.
+                        await asyncio.gather(
+                            *(
+                                self.sandbox_manager.execute_shell(sandbox, command)
+                                for command in setup_commands
+                            )
+                        )
+                    # Only snapshot setups slow enough to amortize snapshot cost.
+                    if time.monotonic() - setup_start >= DAYTONA_SNAPSHOT_MIN_SETUP_SECONDS:
+                        await self.sandbox_manager.try_snapshot(snapshot_key, sandbox)
+            except BaseException:
+                try:
+                    await self.sandbox_manager.remove_sandbox(sandbox)
+                except Exception as e:
+                    logger.error("Failed to remove sandbox after setup failure", error=str(e))
+                raise
+            return sandbox
+
+        # Sandbox creation is deferred until the interface is first used, so
+        # tasks that never touch the computer skip the create cost entirely.
+        interface = DaytonaComputerInterface(
+            self.sandbox_manager, sandbox_factory=_create_and_setup
+        )
 
-            # Create and yield the interface
-            interface = DaytonaComputerInterface(self.sandbox_manager, sandbox)
-
+        try:
             # Disable internet if configured
             if not config.allow_internet:
                 await interface.disable_internet()
 
             yield interface
         finally:
-            # Clean up the sandbox
+            # Clean up the sandbox, if one was ever created
             try:
-                await self.sandbox_manager.remove_sandbox(sandbox)
+                await interface.stop()
             except Exception as e:
                 logger.error("Failed to remove sandbox", error=str(e))
 
+    @staticmethod
+    def _snapshot_key(config: ComputerConfiguration) -> Any:
+        """Fingerprint the parts of a config that sandbox setup depends on."""
+        return (
+            config.docker_image,
+            tuple(sorted((key, str(value)) for key, value in config.environment.items())),
+            config.cwd,
+        )
+
     def _config_to_daytona_params(self, config: ComputerConfiguration) -> Dict[str, Any]:
         """Convert nanoeval computer configuration to Daytona sandbox parameters."""
-        # Map CPU and memory requirements
-        resources = SandboxResources(
-            cpu=max(1, int(config.resources.cpu)),  # Minimum 1 CPU
-            memory=max(1, config.resources.memory // 1024),  # Convert MB to GB, minimum 1GB
-            disk=DAYTONA_SANDBOX_DISK,  # Default or configured disk
+        cached = _daytona_params(
+            max(1, int(config.resources.cpu)),  # Minimum 1 CPU
+            max(1, config.resources.memory // 1024),  # Convert MB to GB, minimum 1GB
+            DAYTONA_SANDBOX_DISK,  # Default or configured disk
+            DAYTONA_AUTO_STOP_INTERVAL,
         )
-
-        params = {
-            "language": LspLanguageId.PYTHON,
-            "resources": resources,
-            "autoStopInterval": DAYTONA_AUTO_STOP_INTERVAL,
-        }
-
-        # Add any additional configuration needed for Daytona
-        # This is a placeholder for future extensions
-
-        return params
\ No newline at end of file
+        # Shallow copy so callers can't mutate the cached entry.
+        return dict(cached)
\ No newline at end of file
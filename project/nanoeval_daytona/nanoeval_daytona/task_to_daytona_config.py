@@ -1,11 +1,17 @@
 """Utilities for converting ComputerConfiguration to Daytona sandbox configuration."""
 
+import re
 from typing import Any, Dict, Optional
 
 from daytona_sdk import LspLanguageId, SandboxResources
 
 from nanoeval.solvers.computer_tasks.code_execution_interface import ComputerConfiguration
 
+# Extracts the Python version from image names like python:3.11 or
+# python-slim:3.11.4; compiled once so per-task conversion avoids repeated
+# parsing and exception-driven control flow.
+_PY_TAG = re.compile(r"python[^:]*:(3\.\d+(?:\.\d+)?)")
+
 
 def task_to_daytona_params(task: ComputerConfiguration) -> Dict[str, Any]:
     """Convert a ComputerConfiguration to Daytona sandbox parameters.
@@ -43,14 +49,8 @@ def task_to_daytona_params(task: ComputerConfiguration) -> Dict[str, Any]:
     
     # Additional Daytona-specific configurations can be added here
     # For example, specific Python version requirements or additional tools
-    if task.docker_image and "python" in task.docker_image:
-        # Try to extract Python version from image name if it's a Python image
-        # e.g., python:3.11 -> 3.11
-        try:
-            version = task.docker_image.split(":")[1]
-            if version.startswith("3."):
-                params["pythonVersion"] = version
-        except (IndexError, ValueError):
-            pass
-            
+    match = _PY_TAG.search(task.docker_image or "")
+    if match:
+        params["pythonVersion"] = match.group(1)
+
     return params
@@ -1,23 +1,36 @@
 """Tests for the Daytona sandbox integration."""
 
+import asyncio
+import io
 import os
+import re
+import tarfile
 import unittest.mock as mock
 
+import httpx
 import pytest
 from daytona_sdk import Daytona, DaytonaConfig, SandboxResources
 
+import nanoeval_daytona.daytona_computer_interface as dci
+
 from nanoeval_daytona.daytona_computer_interface import (
     DaytonaSandboxManager,
     DaytonaComputerInterface,
     DaytonaComputerRuntime,
 )
 from nanoeval_daytona.task_to_daytona_config import task_to_daytona_params
-from nanoeval.solvers.computer_tasks.code_execution_interface import ComputerConfiguration
+from nanoeval.solvers.computer_tasks.code_execution_interface import (
+    ComputerConfiguration,
+    ContainerResources,
+)
 
 
 @pytest.fixture
 def mock_daytona():
     """Create a mock Daytona SDK instance."""
+    from nanoeval_daytona.daytona_computer_interface import _get_daytona_client
+
+    _get_daytona_client.cache_clear()
     with mock.patch("nanoeval_daytona.daytona_computer_interface.Daytona") as mock_daytona:
         # Mock sandbox instance
         mock_sandbox = mock.AsyncMock()
@@ -66,6 +79,117 @@ async def test_sandbox_creation(mock_daytona):
     assert sandbox == mock_sandbox
 
 
+@pytest.mark.asyncio
+async def test_sandbox_manager_shares_client(mock_daytona):
+    """Test that managers with the same credentials share one SDK client."""
+    mock_daytona_instance, _ = mock_daytona
+
+    manager_a = DaytonaSandboxManager()
+    manager_b = DaytonaSandboxManager()
+
+    assert manager_a.daytona is manager_b.daytona is mock_daytona_instance
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_acquire_and_refill(mock_daytona):
+    """Test that acquire_sandbox serves from the warm pool and refills it."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+
+    manager = DaytonaSandboxManager(pool_size=1)
+
+    # First acquire starts the filler; the pool is still cold so it falls back
+    # to a direct create.
+    sandbox = await manager.acquire_sandbox()
+    assert sandbox == mock_sandbox
+
+    # Let the background filler run, then the pool should serve without a
+    # fresh create call.
+    await manager._pool_filler
+    create_calls = mock_daytona_instance.create.call_count
+    sandbox = await manager.acquire_sandbox()
+    assert sandbox == mock_sandbox
+    assert mock_daytona_instance.create.call_count == create_calls
+
+    # Non-default params bypass the pool.
+    await manager.acquire_sandbox({"autoStopInterval": 99})
+    assert mock_daytona_instance.create.call_count > create_calls
+
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_stays_closed(mock_daytona):
+    """Test that close() drains the pool for good, without filler restarts."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+
+    manager = DaytonaSandboxManager(pool_size=2)
+    await manager.acquire_sandbox()
+    await manager._pool_filler
+
+    await manager.close()
+    assert manager._pool.qsize() == 0
+
+    # Removing a sandbox after close must not restart the filler and re-warm.
+    create_calls = mock_daytona_instance.create.call_count
+    await manager.remove_sandbox(mock_sandbox)
+    await asyncio.sleep(0)
+    assert manager._pool_filler is None
+    assert mock_daytona_instance.create.call_count == create_calls
+
+
+@pytest.mark.asyncio
+async def test_readiness_webhook_round_trip(mock_daytona, monkeypatch):
+    """Test that a POST to the readiness webhook unblocks wait_sandbox_ready."""
+    mock_daytona_instance, _ = mock_daytona
+    monkeypatch.setattr(dci, "DAYTONA_READY_WEBHOOK_URL", "http://127.0.0.1:18799")
+    monkeypatch.setattr(dci, "DAYTONA_READY_WEBHOOK_PORT", 18799)
+
+    manager = DaytonaSandboxManager()
+    try:
+        sandbox = await manager.create_sandbox()
+
+        # The init command carries a token URL pointing at the webhook.
+        params = mock_daytona_instance.create.call_args.args[0]
+        (init_command,) = params["initCommands"]
+        match = re.search(r"/ready/(\w+)", init_command)
+        assert match is not None
+        token = match.group(1)
+
+        waiter = asyncio.create_task(manager.wait_sandbox_ready(sandbox.id, timeout=5))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        # POST as the sandbox's init command would.
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"http://127.0.0.1:18799/ready/{token}")
+        assert response.status_code == 200
+        await asyncio.wait_for(waiter, timeout=5)
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_readiness_webhook_bind_conflict(mock_daytona, monkeypatch):
+    """Test that a taken webhook port degrades to eager readiness, not errors."""
+    monkeypatch.setattr(dci, "DAYTONA_READY_WEBHOOK_URL", "http://127.0.0.1:18798")
+    monkeypatch.setattr(dci, "DAYTONA_READY_WEBHOOK_PORT", 18798)
+
+    manager_a = DaytonaSandboxManager()
+    manager_b = DaytonaSandboxManager()
+    try:
+        await manager_a.create_sandbox()
+        assert manager_a._webhook_runner is not None
+
+        # Second manager can't bind the same port; creating must still work
+        # and readiness must resolve immediately instead of stalling.
+        sandbox_b = await manager_b.create_sandbox()
+        assert manager_b._webhook_runner is None
+        await asyncio.wait_for(manager_b.wait_sandbox_ready(sandbox_b.id), timeout=5)
+    finally:
+        await manager_a.close()
+        await manager_b.close()
+
+
 @pytest.mark.asyncio
 async def test_sandbox_code_execution(mock_daytona):
     """Test executing code in a Daytona sandbox."""
@@ -114,13 +238,196 @@ async def test_sandbox_file_operations(mock_daytona):
     assert content == test_content
 
 
+@pytest.mark.asyncio
+async def test_streamed_file_upload(mock_daytona):
+    """Test that file-like and async-iterator uploads are streamed in chunks."""
+    _, mock_sandbox = mock_daytona
+    manager = DaytonaSandboxManager()
+
+    # File-like objects stream through read(); small content fits one chunk.
+    await manager.upload_file(mock_sandbox, io.BytesIO(b"streamed content"), "/test/stream.txt")
+    mock_sandbox.fs.write_file.assert_called_once_with("/test/stream.txt", b"streamed content")
+
+    # Async iterators: first chunk writes, subsequent chunks append.
+    async def chunks():
+        yield b"part one "
+        yield b"part two"
+
+    mock_sandbox.fs.reset_mock()
+    await manager.upload_file(mock_sandbox, chunks(), "/test/parts.txt")
+    mock_sandbox.fs.write_file.assert_called_once_with("/test/parts.txt", b"part one ")
+    mock_sandbox.fs.append_file.assert_called_once_with("/test/parts.txt", b"part two")
+
+    # SDKs without an append API get a single whole-buffer write instead.
+    mock_sandbox.fs.reset_mock()
+    del mock_sandbox.fs.append_file
+    await manager.upload_file(mock_sandbox, chunks(), "/test/noappend.txt")
+    mock_sandbox.fs.write_file.assert_called_once_with("/test/noappend.txt", b"part one part two")
+
+
+@pytest.mark.asyncio
+async def test_parallel_multipart_upload(mock_daytona):
+    """Test that large uploads are split into concurrently-transferred parts."""
+    _, mock_sandbox = mock_daytona
+    manager = DaytonaSandboxManager()
+
+    content = b"abcdefghij"
+    await manager.upload_file_parallel(mock_sandbox, content, "/test/big.bin", part_size=4)
+
+    assert mock_sandbox.fs.write_file_part.call_count == 3
+    parts = {
+        call.args[1]: bytes(call.args[2])
+        for call in mock_sandbox.fs.write_file_part.call_args_list
+    }
+    assert parts == {0: b"abcd", 4: b"efgh", 8: b"ij"}
+
+    # Payloads that fit in one part take the plain upload path.
+    mock_sandbox.fs.reset_mock()
+    await manager.upload_file_parallel(mock_sandbox, b"tiny", "/test/small.bin", part_size=4096)
+    mock_sandbox.fs.write_file.assert_called_once_with("/test/small.bin", b"tiny")
+
+
+@pytest.mark.asyncio
+async def test_upload_many_bundles_tar(mock_daytona):
+    """Test that upload_many ships all files in one tar archive."""
+    _, mock_sandbox = mock_daytona
+    mock_sandbox.shell.exec.return_value = {"output": "", "exitCode": 0}
+
+    manager = DaytonaSandboxManager()
+    interface = DaytonaComputerInterface(manager, mock_sandbox)
+    await interface.upload_many({"/test/a.txt": b"alpha", "/test/b.txt": b"beta"})
+
+    # One upload carrying a tar with both members, then one untar command.
+    mock_sandbox.fs.write_file.assert_called_once()
+    archive = mock_sandbox.fs.write_file.call_args.args[1]
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        assert {m.name for m in tar.getmembers()} == {"test/a.txt", "test/b.txt"}
+        assert tar.extractfile("test/a.txt").read() == b"alpha"
+    mock_sandbox.shell.exec.assert_called_once()
+    assert "tar -xf" in mock_sandbox.shell.exec.call_args.args[0]
+
+    # A failed extraction must raise instead of silently dropping the files.
+    mock_sandbox.shell.exec.return_value = {"output": "tar: error", "exitCode": 2}
+    with pytest.raises(RuntimeError, match="Failed to extract"):
+        await interface.upload_many({"/test/c.txt": b"gamma"})
+
+
+@pytest.mark.asyncio
+async def test_lazy_sandbox_creation(mock_daytona):
+    """Test that the runtime defers sandbox creation until first use."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+    mock_sandbox.shell.exec.return_value = {"output": "", "exitCode": 0}
+
+    runtime = DaytonaComputerRuntime()
+    config = ComputerConfiguration()
+
+    async with runtime.run(config) as interface:
+        # Entering the context must not create a sandbox yet.
+        assert mock_daytona_instance.create.call_count == 0
+        await interface.send_shell_command("true")
+        assert mock_daytona_instance.create.call_count == 1
+    mock_daytona_instance.remove.assert_called_once()
+
+    # A context that never touches the computer never creates a sandbox.
+    mock_daytona_instance.reset_mock()
+    async with runtime.run(config):
+        pass
+    assert mock_daytona_instance.create.call_count == 0
+    assert mock_daytona_instance.remove.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_fork_hit_skips_create_and_setup(mock_daytona):
+    """Test that a recorded snapshot is forked instead of creating fresh."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+    mock_daytona_instance.fork = mock.AsyncMock(return_value=mock_sandbox)
+    mock_sandbox.shell.exec.return_value = {"output": "", "exitCode": 0}
+
+    runtime = DaytonaComputerRuntime()
+    config = ComputerConfiguration()
+    key = DaytonaComputerRuntime._snapshot_key(config)
+    runtime.sandbox_manager._snapshots[key] = "snap-1"
+
+    async with runtime.run(config) as interface:
+        result = await interface.send_shell_command("true")
+        assert result.exit_code == 0
+
+    mock_daytona_instance.fork.assert_called_once_with("snap-1")
+    mock_daytona_instance.create.assert_not_called()
+    # The snapshot already contains the setup; the only shell call is ours.
+    assert mock_sandbox.shell.exec.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fork_failure_falls_back_to_create(mock_daytona):
+    """Test that a failing fork falls back to create plus full setup."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+    mock_daytona_instance.fork = mock.AsyncMock(side_effect=RuntimeError("snapshot gone"))
+    mock_sandbox.shell.exec.return_value = {"output": "", "exitCode": 0}
+
+    runtime = DaytonaComputerRuntime()
+    config = ComputerConfiguration()
+    key = DaytonaComputerRuntime._snapshot_key(config)
+    runtime.sandbox_manager._snapshots[key] = "snap-1"
+
+    async with runtime.run(config) as interface:
+        await interface.send_shell_command("true")
+
+    mock_daytona_instance.fork.assert_called_once()
+    mock_daytona_instance.create.assert_called_once()
+    # Setup ran on the fresh sandbox in addition to our command.
+    assert mock_sandbox.shell.exec.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_gated_on_setup_duration(mock_daytona, monkeypatch):
+    """Test that snapshots are only taken when setup was slow enough."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+    mock_daytona_instance.snapshot = mock.AsyncMock(return_value="snap-9")
+    mock_sandbox.shell.exec.return_value = {"output": "", "exitCode": 0}
+
+    runtime = DaytonaComputerRuntime()
+    config = ComputerConfiguration()
+    key = DaytonaComputerRuntime._snapshot_key(config)
+
+    # Mocked setup finishes well under the default threshold: no snapshot.
+    async with runtime.run(config) as interface:
+        await interface.send_shell_command("true")
+    mock_daytona_instance.snapshot.assert_not_called()
+    assert key not in runtime.sandbox_manager._snapshots
+
+    # With the threshold at zero, the same setup gets snapshotted.
+    monkeypatch.setattr(dci, "DAYTONA_SNAPSHOT_MIN_SETUP_SECONDS", 0.0)
+    async with runtime.run(config) as interface:
+        await interface.send_shell_command("true")
+    mock_daytona_instance.snapshot.assert_called_once()
+    assert runtime.sandbox_manager._snapshots[key] == "snap-9"
+
+
+@pytest.mark.asyncio
+async def test_sandbox_removed_when_setup_fails(mock_daytona):
+    """Test that a sandbox created for a failing setup is still removed."""
+    mock_daytona_instance, mock_sandbox = mock_daytona
+    mock_sandbox.shell.exec.side_effect = RuntimeError("setup exploded")
+
+    runtime = DaytonaComputerRuntime()
+    config = ComputerConfiguration()
+
+    async with runtime.run(config) as interface:
+        with pytest.raises(RuntimeError, match="setup exploded"):
+            await interface.send_shell_command("true")
+
+    assert mock_daytona_instance.create.call_count == 1
+    mock_daytona_instance.remove.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_task_to_daytona_params():
     """Test converting ComputerConfiguration to Daytona parameters."""
     # Create a test configuration
     config = ComputerConfiguration(
         docker_image="python:3.11",
-        resources=mock.MagicMock(cpu=2, memory=4096),
+        resources=ContainerResources(cpu=2, memory=4096),
         timeout=300,
         allow_internet=True,
     )
@@ -139,10 +446,32 @@ async def test_task_to_daytona_params():
     assert params["pythonVersion"] == "3.11"
 
 
+@pytest.mark.asyncio
+async def test_execute_fast_path_skips_sandbox(mock_daytona):
+    """Test that empty and constant snippets never reach the sandbox."""
+    _, mock_sandbox = mock_daytona
+
+    manager = DaytonaSandboxManager()
+    interface = DaytonaComputerInterface(manager, mock_sandbox)
+
+    result = await interface.execute("")
+    assert result.status == "success"
+    assert result.final_expression_output is None
+
+    result = await interface.execute("42")
+    assert result.status == "success"
+    assert result.final_expression_output == "42"
+
+    result = await interface.execute("'hello'")
+    assert result.final_expression_output == "'hello'"
+
+    mock_sandbox.process.code_run.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_computer_interface(mock_daytona):
     """Test the DaytonaComputerInterface functionality."""
-    _, mock_sandbox = mock_daytona
+    mock_daytona_instance, mock_sandbox = mock_daytona
     
     # Mock successful code execution
     mock_sandbox.process.code_run.return_value = {
@@ -174,14 +503,17 @@ async def test_computer_interface(mock_daytona):
     
     # Test file operations
     test_content = b"test file content"
+    mock_sandbox.fs.read_file.return_value = test_content
     await interface.upload(test_content, "/test/file.txt")
     content = await interface.download("/test/file.txt")
     assert content == test_content
-    
+    # The interface-level download honors the ComputerInterface bytes contract.
+    assert isinstance(content, bytes)
+
     # Test container name retrieval (sandbox ID)
     container_names = await interface.fetch_container_names()
     assert container_names == ["test-sandbox-id"]
-    
+
     # Test stopping the sandbox
     await interface.stop()
-    mock_sandbox.manager.remove.assert_called_once()
+    mock_daytona_instance.remove.assert_called_once_with(mock_sandbox)